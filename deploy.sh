@@ -22,6 +22,13 @@ WINDSURF_SRC="${REPO_DIR}/windsurf"
 WINDSURF_HOOKS_DEST1="/usr/local/share/windsurf-hooks"
 WINDSURF_HOOKS_DEST2="/root/.codeium/hooks"
 WINDSURF_DEST="/etc/windsurf"
+WINDSURF_HOOKS_BIN="${WINDSURF_DEST}/hooks/bin"
+
+# Hot-path hooks compiled ahead of time when Nuitka is installed. Each must
+# have an entry in windsurf/hooks.json, which is pointed at its binary.
+AOT_HOOKS=(
+    pre_write_combined
+)
 
 # User/Group for permissions (adjust if needed)
 OWNER="root:root"
@@ -90,6 +97,47 @@ deploy_directory() {
     log_info "Deployed to $dest with permissions set"
 }
 
+compile_hooks() {
+    local src="$1"
+    local dest="$2"
+    local config="${WINDSURF_DEST}/hooks.json"
+
+    if ! python3 -m nuitka --version >/dev/null 2>&1; then
+        log_warn "Nuitka not installed; hooks stay interpreted (pip install nuitka for AOT builds)"
+        return 0
+    fi
+
+    local hook
+    # A hook hooks.json does not run would be built and never used
+    for hook in "${AOT_HOOKS[@]}"; do
+        if ! grep -qF "python3 ${WINDSURF_HOOKS_DEST1}/${hook}.py" "$config"; then
+            log_error "${hook}.py is listed in AOT_HOOKS but not run by ${config}"
+            exit 1
+        fi
+    done
+
+    local build_dir
+    build_dir="$(mktemp -d)"
+    mkdir -p "$dest"
+
+    for hook in "${AOT_HOOKS[@]}"; do
+        log_info "Compiling ${hook}.py with Nuitka"
+        if python3 -m nuitka --standalone --lto=yes --remove-output --follow-imports \
+            --output-dir="$build_dir" --output-filename="$hook" "${src}/${hook}.py" >/dev/null; then
+            rm -rf "${dest:?}/${hook}.dist"
+            cp -r "${build_dir}/${hook}.dist" "${dest}/${hook}.dist"
+            # Point the deployed editor config at the binary
+            sed -i "s|python3 ${WINDSURF_HOOKS_DEST1}/${hook}.py|${dest}/${hook}.dist/${hook}|" "$config"
+        else
+            log_warn "Nuitka build failed for ${hook}.py; keeping the Python hook"
+        fi
+    done
+
+    rm -rf "$build_dir"
+    chown -R "$OWNER" "$dest"
+    log_info "Compiled hooks installed to $dest"
+}
+
 verify_deployment() {
     local dest="$1"
     
@@ -117,6 +165,9 @@ main() {
     
     # Deploy windsurf
     deploy_directory "$WINDSURF_SRC" "$WINDSURF_DEST"
+
+    # Compile hot-path hooks (optional, needs Nuitka)
+    compile_hooks "$WINDSURF_HOOKS_SRC" "$WINDSURF_HOOKS_BIN"
     
     # Verify deployments
     verify_deployment "$WINDSURF_HOOKS_DEST1"
@@ -0,0 +1,408 @@
+#!/bin/bash
+# Regression tests for the shared pre_write scanner (scanner.py) and the hooks built on it
+
+set -e
+
+HOOKS_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../windsurf-hooks" && pwd)"
+REPO_POLICY="$(cd "$(dirname "${BASH_SOURCE[0]}")/../windsurf/policy" && pwd)/policy.json"
+
+# Colors
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+test_count=0
+pass_count=0
+fail_count=0
+
+# The deployed policy takes precedence over the repo-local one the tests set up
+if [[ -f /etc/windsurf/policy/policy.json ]]; then
+    echo -e "${YELLOW}!${NC} /etc/windsurf/policy/policy.json overrides the test policy; skipping"
+    exit 0
+fi
+
+# Hooks run from a scratch copy so each test can write its own policy.json
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
+cp -r "$HOOKS_DIR" "$WORK_DIR/windsurf-hooks"
+rm -rf "$WORK_DIR/windsurf-hooks/__pycache__"
+mkdir -p "$WORK_DIR/windsurf/policy" "$WORK_DIR/home" "$WORK_DIR/code"
+POLICY_FILE="$WORK_DIR/windsurf/policy/policy.json"
+
+# pre_write_completeness keeps its result cache under $HOME
+export HOME="$WORK_DIR/home"
+
+# set_policy JSON: the repo policy.json with JSON's top-level keys overridden
+set_policy() {
+    python3 - "$REPO_POLICY" "$POLICY_FILE" "$1" << 'PYSCRIPT'
+import json, sys
+policy = json.load(open(sys.argv[1]))
+policy.update(json.loads(sys.argv[3]))
+json.dump(policy, open(sys.argv[2], "w"))
+PYSCRIPT
+}
+
+# make_payload NAME PATH CODE_FILE [PATH CODE_FILE ...]: one edit per pair
+make_payload() {
+    python3 - "$WORK_DIR/$1.json" "${@:2}" << 'PYSCRIPT'
+import json, sys
+out, pairs = sys.argv[1], sys.argv[2:]
+edits = [{"path": pairs[i], "new_string": open(pairs[i + 1]).read()} for i in range(0, len(pairs), 2)]
+json.dump({"tool_info": {"edits": edits}}, open(out, "w"))
+PYSCRIPT
+}
+
+# run_hook HOOK PAYLOAD: exit code in $hook_exit, stderr in $WORK_DIR/HOOK.err
+run_hook() {
+    hook_exit=0
+    python3 "$WORK_DIR/windsurf-hooks/$1.py" < "$WORK_DIR/$2.json" > /dev/null 2> "$WORK_DIR/$1.err" || hook_exit=$?
+}
+
+# check DESCRIPTION EXPECTED ACTUAL
+check() {
+    test_count=$((test_count + 1))
+    if [[ "$2" == "$3" ]]; then
+        echo -e "${GREEN}✓${NC} Test $test_count: $1"
+        pass_count=$((pass_count + 1))
+    else
+        echo -e "${RED}✗${NC} Test $test_count: $1 (expected $2, got $3)"
+        fail_count=$((fail_count + 1))
+    fi
+}
+
+# reported HOOK TEXT: "yes" if the hook's last stderr contains TEXT
+reported() {
+    if grep -qF -- "$2" "$WORK_DIR/$1.err"; then echo "yes"; else echo "no"; fi
+}
+
+# details HOOK...: every hook's reported violations (bullet lines), sorted
+details() {
+    python3 - "$WORK_DIR" "$@" << 'PYSCRIPT'
+import sys
+lines = []
+for hook in sys.argv[2:]:
+    for line in open(f"{sys.argv[1]}/{hook}.err"):
+        if line.startswith(("  • ", "  - ")):
+            lines.append(line[4:].rstrip("\n"))
+print("\n".join(sorted(lines)))
+PYSCRIPT
+}
+
+# Create test files
+
+# Clean, documented Python
+cat > "$WORK_DIR/code/clean.py" << 'EOF'
+def add_totals(values):
+    """Add up every value in the list and return the grand total."""
+    total_sum = 0
+    for value in values:
+        total_sum += value
+    return total_sum
+EOF
+
+# Escape primitive that policy.json does not prohibit
+cat > "$WORK_DIR/code/escape.py" << 'EOF'
+def fetch_page(address):
+    """Fetch one page from the given address and return its body."""
+    return urllib.request.urlopen(address).read()
+EOF
+
+# Two escape primitives on separate lines
+cat > "$WORK_DIR/code/escape_twice.py" << 'EOF'
+def fetch_page(address):
+    """Fetch one page from the given address and return its body."""
+    connection = socket.create_connection(address)
+    return urllib.parse.quote(address)
+EOF
+
+# Command execution (policy and command rule sets)
+cat > "$WORK_DIR/code/command.py" << 'EOF'
+def list_directory(folder):
+    """List the folder through the shell and return the listing."""
+    return os.popen("ls " + folder).read()
+EOF
+
+# Placeholder (policy rule set only)
+cat > "$WORK_DIR/code/todo.py" << 'EOF'
+def add_totals(values):
+    """Add up every value in the list and return the grand total."""
+    # TODO: handle empty input
+    return sum(values)
+EOF
+
+# Everything at once
+cat "$WORK_DIR/code/escape.py" "$WORK_DIR/code/command.py" "$WORK_DIR/code/todo.py" > "$WORK_DIR/code/mixed.py"
+
+# Multi-line signature with a PEP 257 docstring opening on its own line
+cat > "$WORK_DIR/code/pep257.py" << 'EOF'
+def add_totals(
+    values,
+    start=0,
+):
+    """
+    Add up every value in the list, starting from start.
+
+    Returns the grand total.
+    """
+    # Callers pass start to continue a running total
+    total_sum = start
+    for value in values:
+        total_sum += value
+    return total_sum
+EOF
+
+# No docstring
+cat > "$WORK_DIR/code/nodoc.py" << 'EOF'
+def add_totals(values):
+    total_sum = 0
+    for value in values:
+        total_sum += value
+    return total_sum
+EOF
+
+# Completeness: N TODO lines, and edits above the 512KB windowing threshold
+python3 - "$WORK_DIR/code" << 'PYSCRIPT'
+import sys
+out = sys.argv[1]
+for n in (1, 2, 20, 21):
+    open(f"{out}/todo_{n}.py", "w").write("".join(f"total_{i} = {i}  # TODO wire up\n" for i in range(n)))
+body = "".join(f"total_{i} = {i} + 1\n" for i in range(40000))
+open(f"{out}/large_clean.py", "w").write(body)
+open(f"{out}/large_todo.py", "w").write(body + "# TODO wire up the totals\n")
+# A "#" ending the first 64KB window, then 40 blank lines before its TODO
+head = body[:body.index("\n", 64 * 1024)]
+open(f"{out}/large_split_todo.py", "w").write(head + "  #" + "\n" * 41 + "TODO wire up" + body[len(head):])
+print(head.count("\n") + 1, file=open(f"{out}/large_split_todo.line", "w"))
+PYSCRIPT
+LARGE_TODO_LINE=$(($(wc -l < "$WORK_DIR/code/large_todo.py")))
+LARGE_SPLIT_TODO_LINE=$(cat "$WORK_DIR/code/large_split_todo.line")
+
+# Pattern-gate cases: text matching only the second branch, and anchored text
+echo "value = baz_total" > "$WORK_DIR/code/branch.py"
+printf 'forbidden_call()\n' > "$WORK_DIR/code/anchor_first.py"
+printf 'value = 1\nforbidden_call()\n' > "$WORK_DIR/code/anchor_later.py"
+
+# Patterns that cannot share the fused alternation: inline flags, a
+# backreference, and a group name two rules both use
+echo "value = FORBIDDEN_CALL()" > "$WORK_DIR/code/flagged.py"
+echo "value = \"secret_token\"" > "$WORK_DIR/code/backref_match.py"
+echo "value = \"secret_token'" > "$WORK_DIR/code/backref_mismatch.py"
+echo "denied_op()" > "$WORK_DIR/code/named.py"
+
+# Dynamic evaluation, for patterns spelling it with character code escapes
+echo "value = eval(1)" > "$WORK_DIR/code/eval.py"
+
+echo "=== Shared Scanner Tests ==="
+echo ""
+
+echo "--- Fused scan (pre_write_combined.py vs the separate hooks) ---"
+for sample in clean escape command todo mixed; do
+    make_payload "$sample" "src/app.py" "$WORK_DIR/code/$sample.py"
+done
+for profile in standard execution_only; do
+    set_policy "{\"execution_profile\": \"$profile\", \"escape_detection\": {\"report_all_violations\": true}}"
+    for sample in clean escape command todo mixed; do
+        separate_exit=0
+        for hook in pre_write_code_escape_detection pre_write_code_policy pre_write_command_execution_blocker; do
+            run_hook "$hook" "$sample"
+            [[ $hook_exit -ne 0 ]] && separate_exit=$hook_exit
+        done
+        run_hook pre_write_combined "$sample"
+        check "$profile/$sample: combined exit matches the separate hooks" "$separate_exit" "$hook_exit"
+        check "$profile/$sample: combined reports what the separate hooks report" \
+            "$(details pre_write_code_escape_detection pre_write_code_policy pre_write_command_execution_blocker)" \
+            "$(details pre_write_combined)"
+    done
+done
+
+echo ""
+echo "--- First violation only in execution_only (report_all_violations) ---"
+make_payload escape_twice "src/app.py" "$WORK_DIR/code/escape_twice.py"
+set_policy '{"execution_profile": "execution_only", "escape_detection": {"report_all_violations": false}}'
+run_hook pre_write_code_escape_detection escape_twice
+check "escape detection blocks on the first violation" "2 1" "$hook_exit $(details pre_write_code_escape_detection | wc -l)"
+set_policy '{"execution_profile": "execution_only", "escape_detection": {"report_all_violations": true}}'
+run_hook pre_write_code_escape_detection escape_twice
+check "report_all_violations lists every violation" "2 2" "$hook_exit $(details pre_write_code_escape_detection | wc -l)"
+
+echo ""
+echo "--- Required-literal gate and pattern flags ---"
+make_payload branch "src/app.py" "$WORK_DIR/code/branch.py"
+set_policy '{"execution_profile": "standard", "prohibited_patterns": {"placeholders": ["foobarqux\\\\\\\\|baz"]}}'
+run_hook pre_write_code_policy branch
+check "escaped backslash before | still alternates (code policy)" "2" "$hook_exit"
+run_hook pre_write_combined branch
+check "escaped backslash before | still alternates (combined)" "2" "$hook_exit"
+make_payload anchor_first "src/app.py" "$WORK_DIR/code/anchor_first.py"
+make_payload anchor_later "src/app.py" "$WORK_DIR/code/anchor_later.py"
+set_policy '{"execution_profile": "standard", "prohibited_patterns": {"placeholders": ["^forbidden_call"]}}'
+run_hook pre_write_combined anchor_first
+check "anchored policy pattern matches at the start of the edit" "2" "$hook_exit"
+run_hook pre_write_combined anchor_later
+check "anchored policy pattern keeps single-line ^ (no MULTILINE)" "0" "$hook_exit"
+set_policy "$(cat << 'EOF'
+{"execution_profile": "standard", "prohibited_patterns": {
+    "placeholders": ["(?i)forbidden_call", "([\"'])secret_token\\1", "(?P<word>blocked)_op"],
+    "bypass": ["(?P<word>denied)_op"]}}
+EOF
+)"
+for sample in flagged backref_match backref_mismatch named clean; do
+    make_payload "$sample" "src/app.py" "$WORK_DIR/code/$sample.py"
+done
+for hook in pre_write_code_policy pre_write_combined; do
+    run_hook "$hook" flagged
+    check "inline (?i) flag is honored ($hook)" "2" "$hook_exit"
+    run_hook "$hook" backref_match
+    check "backreference matches its own group ($hook)" "2" "$hook_exit"
+    run_hook "$hook" backref_mismatch
+    check "backreference mismatch is allowed ($hook)" "0" "$hook_exit"
+    run_hook "$hook" named
+    check "group name shared by two rules still matches ($hook)" "2" "$hook_exit"
+    run_hook "$hook" clean
+    check "clean edit is allowed with unfusable patterns ($hook)" "0" "$hook_exit"
+done
+make_payload eval "src/app.py" "$WORK_DIR/code/eval.py"
+for pattern in '\\x65val\\(' '\\x45VAL\\(' '\\u0065val\\('; do
+    set_policy "{\"execution_profile\": \"standard\", \"prohibited_patterns\": {\"placeholders\": [\"$pattern\"]}}"
+    for hook in pre_write_code_policy pre_write_combined; do
+        run_hook "$hook" eval
+        check "character code escape $pattern matches ($hook)" "2" "$hook_exit"
+    done
+done
+
+echo ""
+echo "--- Policy loading: read from the file on every run ---"
+make_payload clean "src/app.py" "$WORK_DIR/code/clean.py"
+# Same size and mtime: a loader keyed on the file's stat would miss the change
+printf '{"execution_profile": "locked"  }' > "$POLICY_FILE"
+for hook in pre_write_combined pre_write_completeness pre_write_comprehensive_comments; do
+    run_hook "$hook" clean
+    check "$hook honors a locked policy" "2" "$hook_exit"
+done
+python3 - "$POLICY_FILE" << 'PYSCRIPT'
+import os, sys
+st = os.stat(sys.argv[1])
+with open(sys.argv[1], "r+") as f:
+    f.write('{"execution_profile": "standard"}')
+os.utime(sys.argv[1], ns=(st.st_atime_ns, st.st_mtime_ns))
+PYSCRIPT
+for hook in pre_write_combined pre_write_completeness pre_write_comprehensive_comments; do
+    run_hook "$hook" clean
+    check "$hook sees the policy rewritten in place" "0" "$hook_exit"
+done
+: > "$POLICY_FILE"
+run_hook pre_write_combined clean
+check "empty policy file falls back to the defaults" "0" "$hook_exit"
+printf '  \n' > "$POLICY_FILE"
+run_hook pre_write_combined clean
+check "whitespace-only policy file falls back to the defaults" "0" "$hook_exit"
+
+echo ""
+echo "--- Completeness: windows, process pool, result cache, reporting limit ---"
+set_policy '{"execution_profile": "standard"}'
+make_payload large_clean "src/app.py" "$WORK_DIR/code/large_clean.py"
+make_payload large_todo "src/app.py" "$WORK_DIR/code/large_todo.py"
+run_hook pre_write_completeness large_clean
+check "clean edit above 512KB is allowed" "0" "$hook_exit"
+run_hook pre_write_completeness large_todo
+check "TODO at the end of an edit above 512KB is blocked" "2" "$hook_exit"
+check "windowed scan reports the TODO's own line" "yes" "$(reported pre_write_completeness "src/app.py:$LARGE_TODO_LINE ")"
+make_payload large_split_todo "src/app.py" "$WORK_DIR/code/large_split_todo.py"
+run_hook pre_write_completeness large_split_todo
+check "TODO reached through blank lines past a window edge is blocked" "2 yes" \
+    "$hook_exit $(reported pre_write_completeness "src/app.py:$LARGE_SPLIT_TODO_LINE ")"
+
+make_payload batch_clean "src/a.py" "$WORK_DIR/code/clean.py" "src/b.py" "$WORK_DIR/code/clean.py" \
+    "src/c.py" "$WORK_DIR/code/clean.py" "src/d.py" "$WORK_DIR/code/clean.py"
+make_payload batch_todo "src/a.py" "$WORK_DIR/code/clean.py" "src/b.py" "$WORK_DIR/code/clean.py" \
+    "src/c.py" "$WORK_DIR/code/todo_1.py" "src/d.py" "$WORK_DIR/code/clean.py"
+for attempt in first repeated; do
+    run_hook pre_write_completeness batch_clean
+    check "$attempt clean multi-edit write is allowed" "0" "$hook_exit"
+    run_hook pre_write_completeness batch_todo
+    check "$attempt multi-edit write with one TODO is blocked" "2 yes" "$hook_exit $(reported pre_write_completeness "src/c.py:1 ")"
+done
+# Result cache entries: a well-formed one is reused as is, malformed ones are rescanned
+find "$HOME/.cache/windsurf_hooks" -type f -exec sh -c 'printf "%s" "$1" > "$2"' _ \
+    '[{"file": "src/c.py", "line": 1, "type": "cached_result"}]' {} \;
+run_hook pre_write_completeness batch_todo
+check "repeated write reuses the cached result" "2 yes" "$hook_exit $(reported pre_write_completeness "cached_result")"
+for entry in '[{"file": "src/c.py"}]' '[1]' '[{"file": "src/c.py", "line": 1, "type": "todo", "snippet": 7}]'; do
+    find "$HOME/.cache/windsurf_hooks" -type f -exec sh -c 'printf "%s" "$1" > "$2"' _ "$entry" {} \;
+    run_hook pre_write_completeness batch_todo
+    check "malformed result cache entry $entry is rescanned" "2 yes" "$hook_exit $(reported pre_write_completeness "src/c.py:1 ")"
+done
+
+for n in 20 21; do
+    make_payload "todo_$n" "src/app.py" "$WORK_DIR/code/todo_$n.py"
+done
+run_hook pre_write_completeness todo_20
+check "exactly max_reported_violations is not reported as truncated" "2 no" "$hook_exit $(reported pre_write_completeness "scan stopped")"
+run_hook pre_write_completeness todo_21
+check "one past max_reported_violations is reported as truncated" "2 yes" "$hook_exit $(reported pre_write_completeness "scan stopped after 20")"
+set_policy '{"execution_profile": "standard", "completeness": {"fail_fast": true}}'
+for n in 1 2; do
+    make_payload "todo_$n" "src/app.py" "$WORK_DIR/code/todo_$n.py"
+done
+run_hook pre_write_completeness todo_1
+check "fail_fast with one violation is not reported as truncated" "2 no" "$hook_exit $(reported pre_write_completeness "scan stopped")"
+run_hook pre_write_completeness todo_2
+check "fail_fast stops after the first violation" "2 yes" "$hook_exit $(reported pre_write_completeness "scan stopped after 1")"
+
+echo ""
+echo "--- Python extraction from the syntax tree (pre_write_comprehensive_comments.py) ---"
+set_policy '{"execution_profile": "standard"}'
+make_payload pep257 "src/app.py" "$WORK_DIR/code/pep257.py"
+make_payload nodoc "src/app.py" "$WORK_DIR/code/nodoc.py"
+run_hook pre_write_comprehensive_comments pep257
+check "multi-line signature with a PEP 257 docstring is allowed" "0" "$hook_exit"
+run_hook pre_write_comprehensive_comments nodoc
+check "function without a docstring is blocked" "2" "$hook_exit"
+
+echo ""
+echo "--- Payload parsing ---"
+# A lone surrogate escape is valid JSON to the stdlib parser but not to orjson
+printf '{"tool_info": {"edits": [{"path": "src/app.py", "new_string": "value = 1  # TODO \\ud800\\n"}]}}' \
+    > "$WORK_DIR/surrogate.json"
+for hook in pre_write_combined pre_write_completeness; do
+    run_hook "$hook" surrogate
+    check "payload with a lone surrogate is scanned ($hook)" "2" "$hook_exit"
+done
+
+echo ""
+echo "--- Test paths: whole directories and test-file name forms ---"
+make_payload test_command "tests/test_app.py" "$WORK_DIR/code/command.py"
+make_payload spec_command "src/app.spec.py" "$WORK_DIR/code/command.py"
+make_payload test_todo "src/app_test.py" "$WORK_DIR/code/todo_1.py"
+make_payload test_nodoc "src/__mocks__/app.py" "$WORK_DIR/code/nodoc.py"
+make_payload contest_command "src/contest/app.py" "$WORK_DIR/code/command.py"
+make_payload mockery_command "src/mockery.py" "$WORK_DIR/code/command.py"
+make_payload mocks_command "src/mocks/app.py" "$WORK_DIR/code/command.py"
+make_payload specific_todo "src/specific.py" "$WORK_DIR/code/todo_1.py"
+run_hook pre_write_combined test_command
+check "test file is exempt from the combined scan" "0" "$hook_exit"
+run_hook pre_write_code_policy spec_command
+check "spec file is exempt from the code policy" "0" "$hook_exit"
+run_hook pre_write_completeness test_todo
+check "*_test file is exempt from completeness" "0" "$hook_exit"
+run_hook pre_write_comprehensive_comments test_nodoc
+check "mock directory is exempt from the comments check" "0" "$hook_exit"
+run_hook pre_write_command_execution_blocker contest_command
+check "a 'test' substring in a directory name is not a test path" "2" "$hook_exit"
+run_hook pre_write_code_policy mockery_command
+check "a 'mock' substring in a file name is not a mock (code policy)" "2" "$hook_exit"
+run_hook pre_write_code_policy mocks_command
+check "mock directories stay subject to the code policy" "2" "$hook_exit"
+run_hook pre_write_completeness specific_todo
+check "a 'spec' substring in a file name is not a spec (completeness)" "2" "$hook_exit"
+
+echo ""
+echo "=== Test Summary ==="
+echo -e "Total: $test_count | ${GREEN}Passed: $pass_count${NC} | ${RED}Failed: $fail_count${NC}"
+
+if [[ $fail_count -eq 0 ]]; then
+    exit 0
+else
+    exit 1
+fi
@@ -27,71 +27,22 @@ If execution_profile is execution_only:
 - No shell wrappers (bash -c, sh -c, cmd /c)
 
 These patterns are not configurable — they are hardcoded enforcement.
+
+The patterns and the scan itself live in scanner.py, shared with
+pre_write_combined (which runs this check in the same pass as the others).
 """
 
-import json
 import sys
-import re
-from pathlib import Path
-from typing import List, Dict
-
-def resolve_policy_path() -> Path:
-    """Resolve policy path (deployed path first, repo-local fallback for testing)."""
-    system_path = Path("/etc/windsurf/policy/policy.json")
-    local_path = Path(__file__).resolve().parents[1] / "windsurf" / "policy" / "policy.json"
-    return system_path if system_path.exists() else local_path
-
-
-POLICY_PATH = resolve_policy_path()
-
-# Hardcoded escape patterns (non-negotiable in execution_only mode)
-ESCAPE_PATTERNS = {
-    "subprocess": [
-        r"subprocess\.",
-        r"import subprocess",
-        r"from subprocess",
-    ],
-    "os_execution": [
-        r"os\.system",
-        r"os\.popen",
-        r"os\.execv",
-        r"os\.spawn",
-    ],
-    "direct_execution": [
-        r"exec\(",
-        r"eval\(",
-        r"compile\(",
-        r"__import__\(",
-    ],
-    "file_operations": [
-        r"open\(",
-        r"\.write\(",
-        r"\.read\(",
-        r"Path.*write",
-        r"Path.*read",
-    ],
-    "network": [
-        r"socket\.",
-        r"import socket",
-        r"urllib\.",
-        r"import urllib",
-        r"requests\.",
-        r"import requests",
-        r"httpx\.",
-        r"import httpx",
-    ],
-    "system_access": [
-        r"ctypes\.",
-        r"cffi\.",
-        r"ffi\.",
-    ],
-    "shell_wrappers": [
-        r"bash -c",
-        r"sh -c",
-        r"cmd /c",
-        r"powershell -Command",
-    ],
-}
+from typing import List
+
+from scanner import (  # ESCAPE_PATTERNS re-exported for existing importers
+    ESCAPE_PATTERNS,
+    detect_escape_patterns,
+    format_escape,
+    load_policy,
+    read_payload,
+    report_all_violations,
+)
 
 
 def block(msg: str, details: List[str] = None):
@@ -104,40 +55,12 @@ def block(msg: str, details: List[str] = None):
     sys.exit(2)
 
 
-def detect_escape_patterns(code: str, path: str = "unknown") -> List[Dict]:
-    """Scan code for escape attempt patterns."""
-    violations = []
-
-    for category, patterns in ESCAPE_PATTERNS.items():
-        for pattern in patterns:
-            matches = list(re.finditer(pattern, code, re.IGNORECASE | re.MULTILINE))
-            if matches:
-                for match in matches:
-                    line_num = code[:match.start()].count("\n") + 1
-                    violations.append(
-                        {
-                            "category": category,
-                            "pattern": pattern,
-                            "line": line_num,
-                            "snippet": match.group(0),
-                            "file": path,
-                        }
-                    )
-
-    return violations
-
-
 def main():
     """Scan code edits for escape attempts in execution-only mode."""
-    try:
-        payload = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        print("ERROR: Invalid JSON input", file=sys.stderr)
-        sys.exit(1)
+    payload = read_payload()
 
     # Check execution profile
-    text = POLICY_PATH.read_text().strip() if POLICY_PATH.exists() else ""
-    policy = json.loads(text) if text else {}
+    policy = load_policy()
 
     execution_profile = policy.get("execution_profile", "standard")
 
@@ -152,20 +75,21 @@ def main():
     if execution_profile == "execution_only":
         edits = (payload.get("tool_info", {}) or {}).get("edits", [])
 
+        # Any violation blocks: stop at the first unless auditing
+        report_all = report_all_violations(policy)
+
         all_violations = []
         for edit in edits:
             new_code = edit.get("new_string", "") or ""
             path = edit.get("path", "unknown")
 
-            violations = detect_escape_patterns(new_code, path)
+            violations = detect_escape_patterns(new_code, path, first_only=not report_all)
             all_violations.extend(violations)
+            if violations and not report_all:
+                break
 
         if all_violations:
-            details = []
-            for v in all_violations:
-                details.append(
-                    f"{v['file']}:{v['line']} ({v['category']}) → {v['snippet']}"
-                )
+            details = [format_escape(v) for v in all_violations]
 
             block(
                 "Code contains escape attempts (execution primitives forbidden in execution_only mode)",
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+pre_write_combined: Escape detection, code policy and command blocking in one pass.
+
+Runs the rule sets of three hooks in a single process:
+- pre_write_code_escape_detection (execution_only mode)
+- pre_write_code_policy
+- pre_write_command_execution_blocker
+
+The payload and policy are parsed once, and each edit's new_string is
+scanned once by a single alternation regex covering every rule set active
+for that edit (see scanner.py). Violations are reported under the header
+of the hook that owns them, so output matches running the hooks separately.
+
+Modes (policy.json execution_profile):
+- locked:         ALL code writes blocked
+- execution_only: escape patterns + code policy + command blocking
+- standard:       code policy + command blocking
+"""
+
+import sys
+from typing import List
+
+from scanner import (
+    build_rule_sets,
+    check_code_policy,
+    format_command,
+    format_escape,
+    format_policy,
+    load_policy,
+    read_payload,
+    report_all_violations,
+    scan_edits,
+    skip_for_command,
+    skip_for_policy,
+)
+
+# Report headers of the hooks this one replaces
+HEADERS = {
+    "escape": (
+        "BLOCKED: pre_write_code_escape_detection",
+        "Code contains escape attempts (execution primitives forbidden in execution_only mode)",
+    ),
+    "command": (
+        "BLOCKED: Command execution detected - policy violation",
+        "HARD FAIL: Command/code execution attempt blocked\n"
+        "All operations must use atlas-gate tools (atlas_gate.write, atlas_gate.exec, etc.)",
+    ),
+    "policy": (
+        "BLOCKED: pre_write_code policy violation",
+        "HARD FAIL: Code does not meet specification (must be real, working implementation)\n"
+        "Violations:",
+    ),
+}
+
+FORMATTERS = {
+    "escape": format_escape,
+    "policy": format_policy,
+    "command": format_command,
+}
+
+
+def block(msg: str, details: List[str] = None):
+    """Block all code writes (locked mode)."""
+    print("BLOCKED: pre_write_combined", file=sys.stderr)
+    print(msg, file=sys.stderr)
+    if details:
+        for detail in details:
+            print(f"  - {detail}", file=sys.stderr)
+    sys.exit(2)
+
+
+def main():
+    """Scan code edits against every pre_write_code rule set at once."""
+    payload = read_payload()
+    policy = load_policy()
+
+    execution_profile = policy.get("execution_profile", "standard")
+
+    # In locked mode: ALL code writes blocked
+    if execution_profile == "locked":
+        block(
+            "System is in LOCKED mode (panic button activated).",
+            ["All code writes are revoked.", "Contact administrator to unlock."],
+        )
+
+    rule_sets = build_rule_sets(policy)
+    edits = (payload.get("tool_info", {}) or {}).get("edits", [])
+
+    violations = {"escape": [], "command": [], "policy": []}
+
+    # execution_only blocks on any violation: stop at the first unless auditing
+    first_only = execution_profile == "execution_only" and not report_all_violations(policy)
+
+    jobs = []
+    for e in edits:
+        path = e.get("path", "unknown")
+
+        # Each rule set keeps the file exemptions of its original hook
+        active = []
+        if execution_profile == "execution_only":
+            active.append("escape")
+        if not skip_for_policy(path):
+            active.append("policy")
+        if not skip_for_command(path):
+            active.append("command")
+        jobs.append((e.get("new_string", "") or "", active, path))
+
+    # With first_only the scan stops at the first edit with a hit
+    for e, (new, active, path), hits in zip(edits, jobs, scan_edits(jobs, rule_sets, first_only)):
+        old = e.get("old_string", "") or ""
+
+        for hit in hits:
+            violations[hit["rule_set"]].append(FORMATTERS[hit["rule_set"]](hit))
+
+        if first_only and hits:
+            break
+
+        if "policy" in active:
+            violations["policy"].extend(check_code_policy(old, new, path, hard_failed=bool(hits)))
+
+        if first_only and any(violations.values()):
+            break
+
+    blocked = False
+    for rule_set, details in violations.items():
+        if not details:
+            continue
+        blocked = True
+        header, msg = HEADERS[rule_set]
+        print(header, file=sys.stderr)
+        print(msg, file=sys.stderr)
+        for detail in details:
+            print(f"  • {detail}", file=sys.stderr)
+
+    sys.exit(2 if blocked else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,20 +14,40 @@ This hook enforces COMPLETENESS at the IDE level BEFORE reaching ATLAS-GATE.
 Code must be done, not sketched.
 """
 
+import bisect
+import hashlib
 import json
+import os
 import sys
 import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Dict, Iterator, List, Set, Tuple
 
-def resolve_policy_path() -> Path:
-    """Resolve policy path (deployed path first, repo-local fallback for testing)."""
-    system_path = Path("/etc/windsurf/policy/policy.json")
-    local_path = Path(__file__).resolve().parents[1] / "windsurf" / "policy" / "policy.json"
-    return system_path if system_path.exists() else local_path
+# Shared with the pre_write_code hooks: the locked check and the completeness
+# settings always come from the root-owned policy.json, parsed per invocation
+from scanner import is_test_path, load_policy, read_payload
 
+# Optional Aho-Corasick automaton for the trigger prefilter (pip install pyahocorasick)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional RE2 engine: linear-time matching for the detector regexes (pip install google-re2)
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Optional Hyperscan multi-pattern DFA for large edits (pip install hyperscan)
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
-POLICY_PATH = resolve_policy_path()
 
 # Patterns that indicate incomplete code (comprehensive list for all languages)
 INCOMPLETENESS_PATTERNS = {
@@ -78,6 +98,75 @@ INCOMPLETENESS_PATTERNS = {
     ],
 }
 
+# Languages by file extension, for scoping language-specific patterns
+HASH_COMMENT_EXTENSIONS = frozenset({
+    ".py", ".pyi", ".sh", ".bash", ".zsh", ".rb", ".r", ".pl", ".pm", ".ps1",
+    ".php", ".jl", ".ex", ".exs", ".nim", ".tcl", ".coffee",
+})
+C_COMMENT_EXTENSIONS = frozenset({
+    ".c", ".h", ".cc", ".cpp", ".cxx", ".hpp", ".hh", ".cs", ".java", ".js", ".jsx",
+    ".mjs", ".cjs", ".ts", ".tsx", ".go", ".rs", ".swift", ".kt", ".kts", ".scala",
+    ".php", ".dart", ".groovy", ".m",
+})
+DASH_COMMENT_EXTENSIONS = frozenset({".sql", ".lua", ".hs", ".elm", ".ada", ".adb", ".ads"})
+PERCENT_COMMENT_EXTENSIONS = frozenset({".m", ".tex", ".erl", ".hrl"})
+PYTHON_EXTENSIONS = frozenset({".py", ".pyi"})
+CPP_EXTENSIONS = frozenset({".cc", ".cpp", ".cxx", ".hpp", ".hh", ".h"})
+
+# Patterns that only make sense in some languages. On a file whose extension
+# belongs to one of these groups, a scoped pattern runs only if the file is in
+# its group; files with any other extension get every pattern.
+PATTERN_SCOPES = {
+    r"#\s*(TODO|FIXME|XXX|HACK|BUG|TEMP|LATER|SOMEDAY|BROKEN)\b": HASH_COMMENT_EXTENSIONS,
+    r"//\s*(TODO|FIXME|XXX|HACK|BUG|TEMP|LATER|SOMEDAY|BROKEN)\b": C_COMMENT_EXTENSIONS,
+    r"/\*\s*(TODO|FIXME|XXX|HACK|BUG|TEMP|LATER|SOMEDAY|BROKEN)\b": C_COMMENT_EXTENSIONS,
+    r"--\s*(TODO|FIXME|XXX|HACK|BUG|TEMP|LATER|SOMEDAY|BROKEN)\b": DASH_COMMENT_EXTENSIONS,
+    r"%\s*(TODO|FIXME|XXX|HACK|BUG|TEMP|LATER|SOMEDAY|BROKEN)\b": PERCENT_COMMENT_EXTENSIONS,
+    r"#\s*(NOTE|REMEMBER|IMPORTANT):\s*implement": HASH_COMMENT_EXTENSIONS,
+    r"//\s*(NOTE|REMEMBER|IMPORTANT):\s*implement": C_COMMENT_EXTENSIONS,
+    r"%\s*(NOTE|REMEMBER|IMPORTANT):\s*implement": PERCENT_COMMENT_EXTENSIONS,
+    r"\bpass\s*$": PYTHON_EXTENSIONS,
+    r"^\s*\.\.\.\s*$": PYTHON_EXTENSIONS,
+    r"\bunimplemented!\s*\(": frozenset({".rs"}),
+    r"\btodo!\s*\(": frozenset({".rs"}),
+    r"\bpanic\s*\(\s*['\"].*not\s+implemented": frozenset({".go"}),
+    r"\bpanic\s*\(\s*['\"].*TODO": frozenset({".go"}),
+    r"std::runtime_error\s*\(\s*['\"].*implement": CPP_EXTENSIONS,
+    r"throw\s+std::runtime_error": CPP_EXTENSIONS,
+    r"\bfatalError\s*\(\s*['\"].*implement": frozenset({".swift"}),
+    r"^\s*return\s+vec!\[\]\s*;?\s*$": frozenset({".rs"}),
+}
+SCOPED_EXTENSIONS = frozenset().union(*PATTERN_SCOPES.values())
+
+# Not source code: never scanned for incompleteness
+NON_CODE_EXTENSIONS = frozenset({".md", ".markdown", ".rst", ".txt", ".json", ".lock", ".csv"})
+
+# Edits larger than CHUNK_THRESHOLD characters are scanned in windows of about
+# CHUNK_SIZE, each with CHUNK_CONTEXT_LINES lines of overlap on both sides
+# (after the window, blank lines do not count; see _windows)
+CHUNK_THRESHOLD = 512 * 1024
+CHUNK_SIZE = 64 * 1024
+CHUNK_CONTEXT_LINES = 16
+
+# Edits per payload from which scanning is spread over a process pool
+PARALLEL_MIN_EDITS = 4
+
+# Violations listed before the hook stops scanning and blocks (policy.json
+# "completeness": "max_reported_violations"); fail_fast stops at the first
+DEFAULT_MAX_REPORTED = 20
+
+# Per-user cache of detector results, keyed by content hash. Only edits WITH
+# violations are cached: a tampered or stale entry can block an edit, but can
+# never let one through.
+_CACHE_DIR = Path.home() / ".cache" / "windsurf_hooks"
+_CACHE_SHARD_LIMIT = 64  # entries per key[:2] shard, least recently used evicted
+_CACHE_VERSION = hashlib.blake2b(
+    # Scope sets are sorted: a frozenset's repr order changes with hash randomization
+    ("completeness-3" + repr(sorted(INCOMPLETENESS_PATTERNS.items()))
+     + repr(sorted((pattern, sorted(scope)) for pattern, scope in PATTERN_SCOPES.items()))).encode(),
+    digest_size=8,
+).hexdigest()
+
 # Allowed contexts where pass is OK (empty except blocks)
 ALLOWED_PASS_CONTEXTS = [
     r"except\s*.*:\s*pass",  # except: pass
@@ -85,6 +174,114 @@ ALLOWED_PASS_CONTEXTS = [
 ]
 
 
+def language_scope(path: str) -> str:
+    """The file's extension if some pattern is scoped to it, else "" (all patterns)."""
+    ext = os.path.splitext(path)[1].lower()
+    return ext if ext in SCOPED_EXTENSIONS else ""
+
+
+def in_scope(pattern: str, scope: str) -> bool:
+    extensions = PATTERN_SCOPES.get(pattern)
+    return not scope or extensions is None or scope in extensions
+
+
+def _fuse(categories: Tuple[str, ...], flags: int, scope: str = "") -> Tuple[re.Pattern, Tuple[str, ...]]:
+    """
+    Compile every in-scope pattern of the given categories into one alternation.
+
+    Alternative i is the named group p<i>; the returned tuple maps i back to
+    its category, so one finditer pass classifies every match. Indices are
+    the same for every scope.
+    """
+    named = []
+    owners = []
+    for category in categories:
+        for pattern in INCOMPLETENESS_PATTERNS[category]:
+            if in_scope(pattern, scope):
+                named.append(f"(?P<p{len(owners)}>{pattern})")
+            owners.append(category)
+    # (?!) never matches: a scope without patterns scans clean
+    return re.compile("|".join(named) or r"(?!)", flags), tuple(owners)
+
+
+# One regex per detector, compiled at import; placeholder returns are case-sensitive
+_DETECTOR_SPECS = {
+    "todo": (("todo_comments", "note_comments"), re.MULTILINE | re.IGNORECASE),
+    "stub": (("stub_keywords",), re.MULTILINE | re.IGNORECASE),
+    "return": (("empty_returns", "placeholder_returns"), re.MULTILINE),
+}
+_TODO_RE, _ = _fuse(*_DETECTOR_SPECS["todo"])
+_STUB_RE, _ = _fuse(*_DETECTOR_SPECS["stub"])
+_RETURN_RE, _ = _fuse(*_DETECTOR_SPECS["return"])
+_RETURN_TYPES = {"empty_returns": "empty_return", "placeholder_returns": "placeholder_return"}
+
+
+def group_labels(regex, owners: Tuple[str, ...]) -> Tuple:
+    """
+    Violation type per group number of a fused regex, resolved at compile time.
+
+    match.lastindex is the enclosing p<i> group (it closes after any group
+    nested in its pattern), so the hot loop classifies a match with one
+    tuple index instead of parsing the group name and chaining lookups.
+    """
+    labels = [None] * (regex.groups + 1)
+    for name, index in regex.groupindex.items():
+        category = owners[int(name[1:])]
+        labels[index] = _RETURN_TYPES.get(category, category)
+    return tuple(labels)
+
+# Lowercase literals every match of a detector contains. An ASCII edit
+# holding none of a detector's triggers cannot match it, so it is skipped.
+DETECTOR_TRIGGERS = {
+    "todo": ("todo", "fixme", "xxx", "hack", "bug", "temp", "later", "someday", "broken", "implement"),
+    "stub": ("pass", "...", "notimplemented", "unsupportedoperationexception", "unimplemented!",
+             "todo!", "panic", "runtime_error", "fatalerror"),
+    "return": ("return",),
+    "function": ("def", "function"),
+}
+
+
+def _build_trigger_automaton():
+    """Aho-Corasick automaton mapping each trigger to every detector it implies."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for trigger in {t for triggers in DETECTOR_TRIGGERS.values() for t in triggers}:
+        # todo! also implies the todo detector
+        automaton.add_word(trigger, frozenset(
+            name for name, triggers in DETECTOR_TRIGGERS.items()
+            if any(t in trigger for t in triggers)
+        ))
+    automaton.make_automaton()
+    return automaton
+
+
+_TRIGGER_AUTOMATON = _build_trigger_automaton()
+
+# Edits at least this large are checked with Hyperscan (when installed)
+# before any detector's regex runs; compiling the database costs more than
+# it saves on small edits
+HYPERSCAN_MIN_SIZE = 64 * 1024
+
+# Whitespace Python's \s matches but Hyperscan's does not: such edits skip it
+_HS_WS_GAP = re.compile(r"[\x1c-\x1f]")
+_HS_DATABASE = None
+_HS_DETECTORS = ("todo", "stub", "return", "function")
+
+_NEWLINE_RE = re.compile(r"\n")
+# Bare-pass lines and except clauses, matched over the whole edit; [^\S\n]
+# keeps every match on one line
+_PASS_RE = re.compile(r"^[^\S\n]*pass[^\S\n]*$", re.MULTILINE)
+_EXCEPT_RE = re.compile(r"except[^\S\n]*(\w+[^\S\n]*)?:")
+# A pass is allowed within this many lines after an except clause
+EXCEPT_LOOKBACK_LINES = 4
+# A whole function-definition line; [^\S\n] keeps every match on one line
+_FUNC_DEF_RE = re.compile(
+    r"^[^\S\n]*(def|function|async function)[^\S\n]+\w+[^\S\n]*\([^)\n]*\)[^\S\n]*[{:]?[^\S\n]*$",
+    re.MULTILINE,
+)
+
+
 def block(msg: str, details: List[str] = None):
     """Block incomplete code."""
     print("BLOCKED: pre_write_completeness - Code is incomplete", file=sys.stderr)
@@ -95,143 +292,376 @@ def block(msg: str, details: List[str] = None):
     sys.exit(2)
 
 
-def detect_todo_comments(code: str, path: str = "unknown") -> List[Dict]:
+def _re2_variant(regex: re.Pattern):
+    """The same regex compiled by RE2 (None when unavailable or unsupported)."""
+    if re2 is None:
+        return None
+    flags = "im" if regex.flags & re.IGNORECASE else "m"
+    try:
+        return re2.compile(f"(?{flags}){regex.pattern}")
+    except Exception:
+        return None
+
+
+_DETECTOR_RES = {"todo": _TODO_RE, "stub": _STUB_RE, "return": _RETURN_RE, "function": _FUNC_DEF_RE}
+
+# (detector, language scope) -> (re build, RE2 build or None, group labels),
+# compiled on first use
+_SCOPED_RES: Dict[Tuple[str, str], Tuple] = {}
+
+# Whitespace Python's \s matches but RE2's does not: such edits stay on re
+_RE2_WS_GAP = re.compile(r"[\x0b\x1c-\x1f]")
+
+
+def detector_regex(name: str, code: str, path: str) -> Tuple:
+    """
+    A detector's regex for the file's language and its group labels.
+
+    The regex is the RE2 build when safe for code: RE2 never backtracks, so
+    whitespace-heavy edits cannot blow up. Its \b, \w and \s differ from re's
+    outside ASCII, so only ASCII edits use it. Both builds share group
+    numbers, so one label tuple serves either.
+    """
+    scope = language_scope(path)
+    compiled = _SCOPED_RES.get((name, scope))
+    if compiled is None:
+        if name in _DETECTOR_SPECS:
+            regex, owners = _fuse(*_DETECTOR_SPECS[name], scope)
+            labels = group_labels(regex, owners)
+        else:
+            regex, labels = _DETECTOR_RES[name], ()
+        compiled = _SCOPED_RES[(name, scope)] = (regex, _re2_variant(regex), labels)
+    regex, fast, labels = compiled
+    if fast is not None and code.isascii() and not _RE2_WS_GAP.search(code):
+        return fast, labels
+    return regex, labels
+
+
+def _hyperscan_database():
+    """Compile (once) every detector's patterns into one Hyperscan block database."""
+    global _HS_DATABASE
+    if _HS_DATABASE is None:
+        caseless = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SINGLEMATCH
+        exact = hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SINGLEMATCH
+        sources = [
+            (_TODO_RE.pattern, caseless),
+            (_STUB_RE.pattern, caseless),
+            (_RETURN_RE.pattern, exact),
+            (_FUNC_DEF_RE.pattern, exact),
+        ]
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        # Hyperscan has no named groups; ids 0-3 follow _HS_DETECTORS
+        db.compile(
+            expressions=[re.sub(r"\(\?P<\w+>", "(", p).encode() for p, _ in sources],
+            ids=list(range(len(sources))),
+            elements=len(sources),
+            flags=[flags for _, flags in sources],
+        )
+        _HS_DATABASE = db
+    return _HS_DATABASE
+
+
+def triggered_detectors(code: str) -> Set[str]:
+    """Detectors that can match code (all of them for non-ASCII code)."""
+    if not code.isascii():
+        # Unicode case folding can match a keyword without its ASCII spelling
+        return set(DETECTOR_TRIGGERS)
+    text = code.lower()
+    if _TRIGGER_AUTOMATON is not None:
+        found = set()
+        for _, detectors in _TRIGGER_AUTOMATON.iter(text):
+            found |= detectors
+            if len(found) == len(DETECTOR_TRIGGERS):
+                break
+    else:
+        # str's substring search runs in C and stops at the first hit, which
+        # beats an interpreted alternation; clean edits exit after a few scans
+        found = {
+            name for name, triggers in DETECTOR_TRIGGERS.items()
+            if any(trigger in text for trigger in triggers)
+        }
+
+    # Large edits: one Hyperscan pass tells which detectors really match
+    if found and hyperscan is not None and len(code) >= HYPERSCAN_MIN_SIZE and not _HS_WS_GAP.search(code):
+        matched = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            matched.add(_HS_DETECTORS[pattern_id])
+
+        try:
+            _hyperscan_database().scan(code.encode(), match_event_handler=on_match)
+        except hyperscan.error:
+            return found
+        found &= matched
+    return found
+
+
+def line_offsets(code: str) -> List[int]:
+    """Start offset of every line, for bisect-based line numbers."""
+    return [0] + [m.end() for m in _NEWLINE_RE.finditer(code)]
+
+
+def detect_todo_comments(code: str, lines: List[str], line_starts: List[int],
+                         path: str = "unknown") -> Iterator[Dict]:
     """Find TODO, FIXME, XXX, HACK comments."""
-    violations = []
-    
-    for category, patterns in {
-        "todo_comments": INCOMPLETENESS_PATTERNS["todo_comments"],
-        "note_comments": INCOMPLETENESS_PATTERNS["note_comments"],
-    }.items():
-        for pattern in patterns:
-            for match in re.finditer(pattern, code, re.MULTILINE | re.IGNORECASE):
-                line_num = code[:match.start()].count("\n") + 1
-                line_text = code.split("\n")[line_num - 1].strip()
-                violations.append({
-                    "type": category,
-                    "line": line_num,
-                    "file": path,
-                    "snippet": match.group(0),
-                    "full_line": line_text[:80],  # First 80 chars
-                })
-    
-    return violations
+    regex, labels = detector_regex("todo", code, path)
+    for match in regex.finditer(code):
+        line_num = bisect.bisect_right(line_starts, match.start())
+        line_text = lines[line_num - 1].strip()
+        yield {
+            "type": labels[match.lastindex],
+            "line": line_num,
+            "file": path,
+            "snippet": match.group(0),
+            "full_line": line_text[:80],  # First 80 chars
+        }
 
 
-def detect_stub_functions(code: str, path: str = "unknown") -> List[Dict]:
+def detect_stub_functions(code: str, lines: List[str], line_starts: List[int],
+                          path: str = "unknown") -> Iterator[Dict]:
     """Find stub functions (pass, NotImplementedError, ...) and exception stubs."""
-    violations = []
-    lines = code.split("\n")
-    
     # Check for stub keywords using the comprehensive patterns
-    for pattern in INCOMPLETENESS_PATTERNS["stub_keywords"]:
-        for match in re.finditer(pattern, code, re.MULTILINE | re.IGNORECASE):
-            line_num = code[:match.start()].count("\n") + 1
-            line_text = code.split("\n")[line_num - 1].strip()
-            violations.append({
+    regex, _ = detector_regex("stub", code, path)
+    for match in regex.finditer(code):
+        line_num = bisect.bisect_right(line_starts, match.start())
+        yield {
+            "type": "stub_function",
+            "line": line_num,
+            "file": path,
+            "snippet": match.group(0)[:60],
+            "reason": f"Stub or incomplete marker: {match.group(0)[:40]}",
+        }
+    
+    # Check for bare pass statements (only in except/try contexts); Python only
+    scope = language_scope(path)
+    if scope and scope not in PYTHON_EXTENSIONS:
+        return
+    
+    # One pass over except-clause and bare-pass lines in text order,
+    # tracking the most recent except line
+    events = sorted(
+        [(bisect.bisect_right(line_starts, m.start()) - 1, "except") for m in _EXCEPT_RE.finditer(code)]
+        + [(bisect.bisect_right(line_starts, m.start()) - 1, "pass") for m in _PASS_RE.finditer(code)]
+    )
+    last_except = -EXCEPT_LOOKBACK_LINES - 1
+    for i, kind in events:
+        if kind == "except":
+            last_except = i
+        elif i - last_except > EXCEPT_LOOKBACK_LINES:
+            yield {
                 "type": "stub_function",
-                "line": line_num,
+                "line": i + 1,
                 "file": path,
-                "snippet": match.group(0)[:60],
-                "reason": f"Stub or incomplete marker: {match.group(0)[:40]}",
-            })
+                "snippet": "pass",
+                "reason": "bare 'pass' outside of except block indicates unfinished code",
+            }
+
+
+def detect_placeholder_returns(code: str, lines: List[str], line_starts: List[int],
+                               path: str = "unknown") -> Iterator[Dict]:
+    """Find placeholder return statements."""
+    regex, labels = detector_regex("return", code, path)
+    for match in regex.finditer(code):
+        line_num = bisect.bisect_right(line_starts, match.start())
+        pattern_type = labels[match.lastindex]
+        yield {
+            "type": "placeholder_return",
+            "line": line_num,
+            "file": path,
+            "snippet": match.group(0),
+            "reason": f"Placeholder {pattern_type}: {match.group(0)}",
+        }
+
+
+def detect_incomplete_functions(code: str, lines: List[str], line_starts: List[int],
+                                path: str = "unknown") -> Iterator[Dict]:
+    """Find functions with only comments/docstrings (no implementation)."""
+    # Simple heuristic: look for function definitions followed only by docstring/comments
+    # This is a conservative check to avoid false positives
     
-    # Check for bare pass statements (only in except/try contexts)
-    for i, line in enumerate(lines, 1):
-        if re.match(r"^\s*pass\s*$", line):
-            # Check if it's in an allowed context
-            in_except_block = False
-            for j in range(max(0, i - 5), i):  # Look back up to 5 lines
-                if re.search(r"except\s*(\w+\s*)?:", lines[j]):
-                    in_except_block = True
+    # JavaScript/TypeScript/Python function patterns (_FUNC_DEF_RE), one pass
+    regex, _ = detector_regex("function", code, path)
+    for match in regex.finditer(code):
+        i = bisect.bisect_right(line_starts, match.start()) - 1
+        line = lines[i]
+        # Check next 3 lines for actual code
+        has_code = False
+        for j in range(i + 1, min(i + 4, len(lines))):
+            next_line = lines[j].strip()
+            if next_line and not next_line.startswith("#") and not next_line.startswith("//"):
+                if '"""' not in next_line and "'''" not in next_line:
+                    has_code = True
                     break
-            
-            if not in_except_block:
-                violations.append({
-                    "type": "stub_function",
-                    "line": i,
+        
+        # If no code found, it might be incomplete
+        # But be conservative—only flag if it's super obvious
+        if not has_code and i + 1 < len(lines):
+            next_line = lines[i + 1].strip()
+            if next_line == "pass" or next_line == "..." or next_line == "":
+                yield {
+                    "type": "incomplete_function",
+                    "line": i + 1,
                     "file": path,
-                    "snippet": "pass",
-                    "reason": "bare 'pass' outside of except block indicates unfinished code",
-                })
-    
-    return violations
+                    "snippet": line.strip()[:80],
+                    "reason": "Function appears to be defined but not implemented",
+                }
 
 
-def detect_placeholder_returns(code: str, path: str = "unknown") -> List[Dict]:
-    """Find placeholder return statements."""
-    violations = []
+def _scan_text(code: str, path: str) -> Iterator[Dict]:
+    """Run every detector that can match code, yielding violations as found."""
+    # Only run detectors whose trigger literals appear in the edit
+    detectors = triggered_detectors(code)
+    if not detectors:
+        return
     
-    for pattern_type, patterns in {
-        "empty_return": INCOMPLETENESS_PATTERNS["empty_returns"],
-        "placeholder_return": INCOMPLETENESS_PATTERNS["placeholder_returns"],
-    }.items():
-        for pattern in patterns:
-            for match in re.finditer(pattern, code, re.MULTILINE):
-                line_num = code[:match.start()].count("\n") + 1
-                violations.append({
-                    "type": "placeholder_return",
-                    "line": line_num,
-                    "file": path,
-                    "snippet": match.group(0),
-                    "reason": f"Placeholder {pattern_type}: {match.group(0)}",
-                })
+    # Split and index the edit once for every detector
+    lines = code.split("\n")
+    line_starts = line_offsets(code)
     
-    return violations
+    # Check for TODOs
+    if "todo" in detectors:
+        yield from detect_todo_comments(code, lines, line_starts, path)
+    
+    # Check for stub functions
+    if "stub" in detectors:
+        yield from detect_stub_functions(code, lines, line_starts, path)
+    
+    # Check for placeholder returns
+    if "return" in detectors:
+        yield from detect_placeholder_returns(code, lines, line_starts, path)
+    
+    # Check for incomplete functions
+    if "function" in detectors:
+        yield from detect_incomplete_functions(code, lines, line_starts, path)
 
 
-def detect_incomplete_functions(code: str, path: str = "unknown") -> List[Dict]:
-    """Find functions with only comments/docstrings (no implementation)."""
-    violations = []
+def _windows(code: str):
+    """
+    Split a large edit into line-aligned windows.
+
+    Yields (window_start, window_end, own_start, own_end) offsets: each line
+    is owned by exactly one window, and every window adds CHUNK_CONTEXT_LINES
+    of context on both sides for multi-line patterns and the pass/def lookups.
+    A detector's \s can run through any number of blank lines, so the context
+    after the window counts only lines with text: a match starting on an
+    owned line always ends inside the window.
+    """
+    own_start = 0
+    while own_start < len(code):
+        own_end = code.find("\n", own_start + CHUNK_SIZE)
+        own_end = len(code) if own_end == -1 else own_end + 1
+        window_start = own_start
+        for _ in range(CHUNK_CONTEXT_LINES):
+            if window_start == 0:
+                break
+            window_start = code.rfind("\n", 0, window_start - 1) + 1
+        window_end = own_end
+        context = 0
+        while context < CHUNK_CONTEXT_LINES and window_end < len(code):
+            next_break = code.find("\n", window_end)
+            line_end = len(code) if next_break == -1 else next_break + 1
+            if not code[window_end:line_end].isspace():
+                context += 1
+            window_end = line_end
+        yield window_start, window_end, own_start, own_end
+        own_start = own_end
+
+
+def _iter_violations(code: str, path: str) -> Iterator[Dict]:
+    """
+    Yield every violation in code, in report order.
+
+    Edits over CHUNK_THRESHOLD are scanned window by window, so line lists and
+    offset tables stay window-sized instead of one object per line of the file.
+    """
+    # Documentation and data files have no code to be incomplete
+    if os.path.splitext(path)[1].lower() in NON_CODE_EXTENSIONS:
+        return
     
-    # Simple heuristic: look for function definitions followed only by docstring/comments
-    # This is a conservative check to avoid false positives
+    if len(code) <= CHUNK_THRESHOLD:
+        yield from _scan_text(code, path)
+        return
     
-    # JavaScript/TypeScript/Python function patterns
-    patterns = [
-        (r"^\s*(def|function|async function)\s+\w+\s*\([^)]*\)\s*[{:]?\s*$", "function_definition"),
-    ]
+    lines_before = 0  # newlines before the current window
+    scanned_to = 0
+    for window_start, window_end, own_start, own_end in _windows(code):
+        lines_before += code.count("\n", scanned_to, window_start)
+        scanned_to = window_start
+        first_owned = lines_before + code.count("\n", window_start, own_start) + 1
+        last_owned = lines_before + code.count("\n", window_start, own_end - 1) + 1
+        for violation in _scan_text(code[window_start:window_end], path):
+            violation["line"] += lines_before
+            # Context lines belong to the neighbouring window
+            if first_owned <= violation["line"] <= last_owned:
+                yield violation
+
+
+def scan_edit(code: str, path: str, limit: int = DEFAULT_MAX_REPORTED) -> List[Dict]:
+    """Run every detector that can match code, stopping after limit violations."""
+    return list(islice(_iter_violations(code, path), limit))
+
+
+def _is_cached_result(cached) -> bool:
+    """Whether a cache entry is a non-empty list of violations main can report."""
+    return isinstance(cached, list) and bool(cached) and all(
+        isinstance(v, dict) and {"file", "line", "type"} <= v.keys() and isinstance(v.get("snippet", ""), str)
+        for v in cached
+    )
+
+
+def cached_scan_edit(code: str, path: str, limit: int = DEFAULT_MAX_REPORTED) -> List[Dict]:
+    """scan_edit, reusing the result of an earlier identical (path, code, limit) scan."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{_CACHE_VERSION}\0{limit}\0{path}\0".encode())
+    digest.update(code.encode("utf-8", "surrogatepass"))
+    key = digest.hexdigest()
+    shard = _CACHE_DIR / key[:2]
+    entry = shard / key
     
-    lines = code.split("\n")
-    for i, line in enumerate(lines):
-        for pattern, match_type in patterns:
-            if re.match(pattern, line):
-                # Check next 3 lines for actual code
-                has_code = False
-                for j in range(i + 1, min(i + 4, len(lines))):
-                    next_line = lines[j].strip()
-                    if next_line and not next_line.startswith("#") and not next_line.startswith("//"):
-                        if '"""' not in next_line and "'''" not in next_line:
-                            has_code = True
-                            break
-                
-                # If no code found, it might be incomplete
-                # But be conservative—only flag if it's super obvious
-                if not has_code and i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    if next_line == "pass" or next_line == "..." or next_line == "":
-                        violations.append({
-                            "type": "incomplete_function",
-                            "line": i + 1,
-                            "file": path,
-                            "snippet": line.strip()[:80],
-                            "reason": "Function appears to be defined but not implemented",
-                        })
+    try:
+        cached = json.loads(entry.read_bytes())
+        # Anything else (a truncated or hand-edited entry) is rescanned
+        if _is_cached_result(cached):
+            os.utime(entry)  # mark as recently used
+            return cached
+    except (OSError, ValueError):
+        pass
     
+    violations = scan_edit(code, path, limit)
+    if violations:
+        try:
+            shard.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(shard), prefix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(violations, f)
+            os.replace(tmp, entry)
+            
+            # Least recently used entries beyond the shard limit are dropped
+            entries = sorted(shard.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+            for stale in entries[_CACHE_SHARD_LIMIT:]:
+                stale.unlink()
+        except OSError:
+            pass
     return violations
 
 
+def max_reported_violations(policy: Dict) -> int:
+    """Violations to collect before blocking: 1 in fail_fast mode, else the policy cap."""
+    settings = policy.get("completeness", {}) or {}
+    if settings.get("fail_fast", False):
+        return 1
+    limit = settings.get("max_reported_violations", DEFAULT_MAX_REPORTED)
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+        return DEFAULT_MAX_REPORTED
+    return limit
+
+
 def main():
     """Check code for completeness violations."""
-    try:
-        payload = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        print("ERROR: Invalid JSON input", file=sys.stderr)
-        sys.exit(1)
+    payload = read_payload()
     
     # Check execution profile
-    text = POLICY_PATH.read_text().strip() if POLICY_PATH.exists() else ""
-    policy = json.loads(text) if text else {}
+    policy = load_policy()
     
     execution_profile = policy.get("execution_profile", "standard")
     
@@ -243,28 +673,39 @@ def main():
         )
     
     edits = (payload.get("tool_info", {}) or {}).get("edits", [])
+    limit = max_reported_violations(policy)
     
     all_violations = []
+    codes = []
+    paths = []
     
     for edit in edits:
-        new_code = edit.get("new_string", "") or ""
         path = edit.get("path", "unknown")
         
-        # Skip test files and mock files (they are allowed to have stubs sometimes)
-        if "test" in path.lower() or "mock" in path.lower():
+        # Skip test and mock files (they are allowed to have stubs sometimes)
+        if is_test_path(path, ("test", "mock")):
             continue
         
-        # Check for TODOs
-        all_violations.extend(detect_todo_comments(new_code, path))
-        
-        # Check for stub functions
-        all_violations.extend(detect_stub_functions(new_code, path))
-        
-        # Check for placeholder returns
-        all_violations.extend(detect_placeholder_returns(new_code, path))
-        
-        # Check for incomplete functions
-        all_violations.extend(detect_incomplete_functions(new_code, path))
+        codes.append(edit.get("new_string", "") or "")
+        paths.append(path)
+    
+    # Identical edits (retries after a block, re-saves) reuse cached results.
+    # Multi-file writes are spread over worker processes; small batches stay
+    # in-process, where forking would cost more than the scan, and are scanned
+    # lazily so no edit is read past the reporting limit. One violation past
+    # the limit is collected to tell whether the report was cut short.
+    workers = min(len(codes), os.cpu_count() or 1)
+    if len(codes) >= PARALLEL_MIN_EDITS and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(cached_scan_edit, codes, paths, repeat(limit + 1)))
+    else:
+        results = map(cached_scan_edit, codes, paths, repeat(limit + 1))
+    for violations in results:
+        all_violations.extend(violations)
+        if len(all_violations) > limit:
+            break
+    truncated = len(all_violations) > limit
+    del all_violations[limit:]
     
     if all_violations:
         details = []
@@ -275,6 +716,8 @@ def main():
             details.append(f"{line_info} - {reason}")
             if snippet:
                 details.append(f"     {snippet}")
+        if truncated:
+            details.append(f"(scan stopped after {limit} violation(s); fix these and retry)")
         
         block(
             "Code contains incomplete markers or stub implementations. "
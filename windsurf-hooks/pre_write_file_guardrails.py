@@ -15,14 +15,31 @@ Rules:
 Rejection is immediate.
 """
 
+import atexit
 import sys
 import json
 import os
+import re
 from datetime import datetime
-import pathlib
+
+# orjson parses large edit payloads several times faster; stdlib json is the fallback.
+try:
+    import orjson
+
+    def _loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects lone surrogate escapes ("\ud800") that json accepts
+            return json.loads(data)
+except ImportError:
+    _loads = json.loads
 
 PLAN_HASH_FILE = "/tmp/windsurf_plan_hash"
+AUDIT_LOG_FILE = "/tmp/windsurf_write_file_audit.log"
 WORKSPACE_ROOT = os.getcwd()
+# Paths inside the workspace start with this (or are the root itself)
+_WORKSPACE_PREFIX = WORKSPACE_ROOT.rstrip(os.sep) + os.sep
 
 PROTECTED_PATHS = [
     "/etc/windsurf/",
@@ -36,6 +53,9 @@ PROTECTED_PATHS = [
     "/root"
 ]
 
+# One anchored alternation over PROTECTED_PATHS, in list order
+_PROTECTED_RE = re.compile("|".join(map(re.escape, PROTECTED_PATHS)))
+
 def get_stored_plan_hash():
     """Get session plan hash"""
     if os.path.exists(PLAN_HASH_FILE):
@@ -63,23 +83,26 @@ def validate_path(path):
         return False, "Path traversal detected"
     
     # Check if within workspace
-    try:
-        rel = pathlib.Path(abs_path).relative_to(WORKSPACE_ROOT)
-    except ValueError:
+    if abs_path != WORKSPACE_ROOT and not abs_path.startswith(_WORKSPACE_PREFIX):
         return False, f"Path outside workspace root: {abs_path}"
     
     # Check protected paths
-    for protected in PROTECTED_PATHS:
-        if abs_path.startswith(protected):
-            return False, f"Protected path: {protected}"
+    protected = _PROTECTED_RE.match(abs_path)
+    if protected:
+        return False, f"Protected path: {protected.group(0)}"
     
     return True, "OK"
 
+_audit_file = None
+
 def audit_log(message):
-    """Log to audit trail"""
+    """Log to audit trail (opened once per process, line-buffered)"""
+    global _audit_file
     try:
-        with open("/tmp/windsurf_write_file_audit.log", "a") as f:
-            f.write(f"[{datetime.now().isoformat()}] {message}\n")
+        if _audit_file is None:
+            _audit_file = open(AUDIT_LOG_FILE, "a", buffering=1)
+            atexit.register(_audit_file.close)
+        _audit_file.write(f"[{datetime.now().isoformat()}] {message}\n")
     except:
         pass
 
@@ -90,7 +113,7 @@ def main():
     """
     
     try:
-        input_data = json.loads(sys.stdin.read()) if sys.stdin.isatty() == False else {}
+        input_data = _loads(sys.stdin.buffer.read()) if sys.stdin.isatty() == False else {}
     except:
         input_data = {}
     
@@ -13,18 +13,24 @@ Rust, PHP, Ruby, Swift, Kotlin, R, MATLAB.
 """
 
 import json
+import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-def resolve_policy_path() -> Path:
-    """Resolve policy path (deployed path first, repo-local fallback for testing)."""
-    system_path = Path("/etc/windsurf/policy/policy.json")
-    local_path = Path(__file__).resolve().parents[1] / "windsurf" / "policy" / "policy.json"
-    return system_path if system_path.exists() else local_path
+# orjson parses large edit payloads several times faster; stdlib json is the fallback.
+try:
+    import orjson
 
-
-POLICY_PATH = resolve_policy_path()
+    def _loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects lone surrogate escapes ("\ud800") that json accepts
+            return json.loads(data)
+except ImportError:
+    _loads = json.loads
 
 LANGUAGE_EXTENSIONS = {
     "python": [".py"],
@@ -44,6 +50,12 @@ LANGUAGE_EXTENSIONS = {
     "matlab": [".m"],
 }
 
+# Extension -> language; an extension listed twice (.h) keeps its first language
+EXTENSION_LANGUAGES = {}
+for _lang, _exts in LANGUAGE_EXTENSIONS.items():
+    for _ext in _exts:
+        EXTENSION_LANGUAGES.setdefault(_ext, _lang)
+
 TEST_CONFIG_FILES = {
     "python": ["pytest.ini", "pyproject.toml", "setup.cfg", "tox.ini"],
     "javascript": ["package.json", "jest.config.js", "vitest.config.ts"],
@@ -80,13 +92,10 @@ LINT_CONFIG_FILES = {
     "matlab": [],
 }
 
+@lru_cache(maxsize=1024)
 def detect_language(path: str) -> str:
-    """Detect language from file extension."""
-    ext = Path(path).suffix.lower()
-    for lang, exts in LANGUAGE_EXTENSIONS.items():
-        if ext in exts:
-            return lang
-    return "unknown"
+    """Detect language from file extension (memoized: edits often repeat a path)."""
+    return EXTENSION_LANGUAGES.get(Path(path).suffix.lower(), "unknown")
 
 def fail(msg, details=None):
     print("BLOCKED: pre_write_language_compliance violation", file=sys.stderr)
@@ -96,26 +105,28 @@ def fail(msg, details=None):
             print(f"  • {d}", file=sys.stderr)
     sys.exit(2)
 
+@lru_cache(maxsize=256)
+def config_exists(repo_root: str, cfg: str) -> bool:
+    """Stat a config file once: test and lint lists and related languages share files."""
+    return os.path.exists(os.path.join(repo_root, cfg))
+
 def check_config_files(repo_root: Path, lang: str, file_types: Dict[str, List[str]]) -> bool:
     """Check if any required config file exists for the language."""
     if lang not in file_types:
         return True
     
-    config_files = file_types[lang]
-    for cfg in config_files:
-        cfg_path = repo_root / cfg
-        if cfg_path.exists():
-            return True
-    
-    return False
+    root = str(repo_root)
+    return any(config_exists(root, cfg) for cfg in file_types[lang])
 
 def main():
-    # Load policy
-    text = POLICY_PATH.read_text().strip() if POLICY_PATH.exists() else ""
-    policy = json.loads(text) if text else {}
-
-    payload = json.load(sys.stdin)
+    try:
+        payload = _loads(sys.stdin.buffer.read())
+    except json.JSONDecodeError:
+        print("ERROR: Invalid JSON input", file=sys.stderr)
+        sys.exit(1)
     edits = (payload.get("tool_info", {}) or {}).get("edits", [])
+    if not edits:
+        sys.exit(0)
     
     # Infer repo root from edit paths
     repo_root = Path.cwd()
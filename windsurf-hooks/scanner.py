@@ -0,0 +1,793 @@
+#!/usr/bin/env python3
+"""
+scanner: Shared single-pass rule engine for the pre_write_code hooks.
+
+pre_write_code_escape_detection, pre_write_code_policy and
+pre_write_command_execution_blocker all scan the same new_string for
+regex rules. This module holds their rule sets and scans an edit once:
+
+- escape:  hardcoded escape patterns (execution_only mode only)
+- policy:  every prohibited_patterns category from policy.json
+- command: the command/bypass/network categories from policy.json
+
+All rules active for an edit are compiled into ONE alternation regex
+(a pattern that cannot share it, such as one with a backreference, is
+compiled on its own). Each alternative is a named group, so m.lastgroup identifies the rule
+(and every rule set that owns it) without rescanning the text. When
+pyahocorasick is installed, plain-literal rules (most of them) move into
+one Aho-Corasick automaton and the regex keeps only the rest. When
+google-re2 is installed, an RE2 set of every rule first rejects clean
+edits in a single DFA pass.
+
+The individual hooks are thin shims over this module; pre_write_combined
+runs all three rule sets in a single process and a single pass.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import sys
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# orjson parses large edit payloads several times faster; stdlib json is the fallback.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Optional Aho-Corasick automaton for the literal rules (pip install pyahocorasick)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional RE2 multi-pattern set to reject clean edits in one DFA pass (pip install google-re2)
+try:
+    import re2
+    if not hasattr(re2, "Set"):
+        re2 = None
+except ImportError:
+    re2 = None
+
+
+# Policy locations in priority order (deployed path first, repo-local
+# fallback for testing). load_policy opens the first one present, with no
+# separate existence check.
+POLICY_PATHS = (
+    "/etc/windsurf/policy/policy.json",
+    str(Path(__file__).resolve().parents[1] / "windsurf" / "policy" / "policy.json"),
+)
+
+# Hardcoded escape patterns (non-negotiable in execution_only mode)
+ESCAPE_PATTERNS = {
+    "subprocess": [
+        r"subprocess\.",
+        r"import subprocess",
+        r"from subprocess",
+    ],
+    "os_execution": [
+        r"os\.system",
+        r"os\.popen",
+        r"os\.execv",
+        r"os\.spawn",
+    ],
+    "direct_execution": [
+        r"exec\(",
+        r"eval\(",
+        r"compile\(",
+        r"__import__\(",
+    ],
+    "file_operations": [
+        r"open\(",
+        r"\.write\(",
+        r"\.read\(",
+        r"Path.*write",
+        r"Path.*read",
+    ],
+    "network": [
+        r"socket\.",
+        r"import socket",
+        r"urllib\.",
+        r"import urllib",
+        r"requests\.",
+        r"import requests",
+        r"httpx\.",
+        r"import httpx",
+    ],
+    "system_access": [
+        r"ctypes\.",
+        r"cffi\.",
+        r"ffi\.",
+    ],
+    "shell_wrappers": [
+        r"bash -c",
+        r"sh -c",
+        r"cmd /c",
+        r"powershell -Command",
+    ],
+}
+
+# policy.json categories enforced by the command rule set, with their messages
+COMMAND_CATEGORIES = {
+    "command_execution_patterns": (
+        "HARD FAIL: Command execution pattern '{pattern}' in {file}:{line} "
+        "(Use atlas_gate.write or atlas_gate.exec tools only)"
+    ),
+    "code_execution_bypass": (
+        "HARD FAIL: Code execution bypass '{pattern}' in {file}:{line} "
+        "(Dynamic code execution forbidden)"
+    ),
+    "tool_bypass_patterns": (
+        "HARD FAIL: Tool bypass attempt '{pattern}' in {file}:{line} "
+        "(All operations must use atlas-gate tools)"
+    ),
+    "network_command_execution": (
+        "HARD FAIL: Network command execution '{pattern}' in {file}:{line} "
+        "(Use atlas_gate.exec for authorized operations)"
+    ),
+}
+
+POLICY_MESSAGE = "HARD FAIL: Absolute prohibition '{pattern}' found in {file}:{line}"
+
+# Language-specific completeness rules: language -> [(compiled regex, message)]
+_EMPTY_METHOD_RULES = [
+    # Check for empty bodies
+    (re.compile(r"(?:public|private|protected)\s+\w+.*\{\s*\}"), "Empty method in {path} (not fully implemented)"),
+]
+LANG_RULES = {
+    "python": [
+        # Check for stub/skeleton functions
+        (re.compile(r"def\s+\w+\s*\([^)]*\)\s*:\s*(?:pass|\.\.\.|\.\.\.|return|raise NotImplementedError)", re.MULTILINE),
+         "Stub/skeleton function in {path} (not fully implemented)"),
+        # Check for unimplemented return paths
+        (re.compile(r"return\s*#.*comment only"), "Return with comment-only value in {path}"),
+    ],
+    "javascript": [
+        # Check for empty functions or stubs
+        (re.compile(r"(function\s+\w+|=>\s*)\s*\{\s*\}"), "Empty function in {path} (not fully implemented)"),
+        (re.compile(r"(function|const)\s+\w+.*\{\s*(?:throw new Error|return|console\.log|undefined)\s*\}"),
+         "Stub function in {path}"),
+    ],
+    "java": _EMPTY_METHOD_RULES,
+    "cpp": _EMPTY_METHOD_RULES,
+    "csharp": _EMPTY_METHOD_RULES,
+    "go": [
+        # Check for stub implementations
+        (re.compile(r"func\s+\w+.*\{\s*(?:return|panic|log\.Fatal)"), "Stub function in {path}"),
+    ],
+    "rust": [
+        # Check for unimplemented/todo macros
+        (re.compile(r"(?:unimplemented|todo)!\s*\("), "unimplemented!() or todo!() macro in {path}"),
+    ],
+}
+
+# Python error-handling check: function headers, top-level def boundaries,
+# external calls that need handling, and the handling itself
+_FUNC_DEF_RE = re.compile(r"def\s+(\w+)\s*\([^)]*\)\s*:")
+_TOP_LEVEL_DEF_RE = re.compile(r"\ndef\s+\w+")
+_IO_CALL_RE = re.compile(r"(?:open|requests\.|urllib\.|json\.load|os\.)")
+_TRY_RE = re.compile(r"try:|except")
+
+COMMENT_PREFIXES = ("#", "//", "/*", "*", "--", "<!--", "%")
+
+# Test code by kind: files under one of these directories, or with one of
+# these file-name forms (test_app.py, app_test.go, app.test.js, app.spec.ts,
+# AppTest.java, ...). Lowercase forms ignore case; CamelCase ones do not,
+# so latest.py or Contest.java stay production code.
+TEST_DIRECTORIES = {
+    "test": frozenset({"test", "tests", "__tests__"}),
+    "spec": frozenset({"spec", "specs"}),
+    "mock": frozenset({"mock", "mocks", "__mocks__"}),
+}
+TEST_NAME_FORMS = {
+    "test": re.compile(r"(?i:^test_|[._]test\.|^conftest\.py$)|[a-z0-9]Tests?\."),
+    "spec": re.compile(r"(?i:[._]spec\.)|[a-z0-9]Spec\."),
+    "mock": re.compile(r"(?i:^mock_|[._]mocks?\.)|[a-z0-9]Mocks?\."),
+}
+
+ESCAPE_RULE_SETS = {"escape": ESCAPE_PATTERNS}
+
+# Rule sets whose original hook matched without re.MULTILINE: their anchored
+# patterns (^, $) are scanned on their own so the anchors keep that meaning
+SINGLE_LINE_RULE_SETS = frozenset({"policy"})
+
+# Escapes that name one character by its code or name (\x45, \u0045,
+# \N{...}, \101) or refer to a group (\1): their text is not the character
+_CHAR_CODE_ESCAPES = frozenset("xuUN0123456789")
+
+# Global inline flags: only valid at the start of the whole regex
+_GLOBAL_FLAGS_RE = re.compile(r"\(\?[aiLmsux]+\)")
+
+# Compiled matcher per (rule sets, active selection), built on first use.
+# Entries hold a reference to their rule sets so the id() key stays unique.
+_COMBINED: Dict[Tuple[int, Tuple[str, ...]], Dict] = {}
+
+_REGEX_META = frozenset(".^$*+?{}[]|()")
+
+# Whitespace Python's \s matches but RE2's does not: text containing any of
+# these skips the RE2 prefilter so it can never hide a match
+_RE2_WS_GAP = re.compile(r"[\x0b\x1c-\x1f]")
+
+
+def _open_policy() -> Optional[int]:
+    """Open the first policy file in POLICY_PATHS that exists (None if none does)."""
+    for path in POLICY_PATHS:
+        try:
+            return os.open(path, os.O_RDONLY)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return None
+
+
+def load_policy() -> Dict:
+    """Read and parse policy.json (empty policy if missing or blank).
+
+    The root-owned policy file is parsed on every invocation, never from a
+    copy a hook user could write. The file is mapped read-only and parsed
+    from the mapping.
+    """
+    fd = _open_policy()
+    if fd is None:
+        return {}
+    try:
+        if os.fstat(fd).st_size == 0:
+            return {}
+        with mmap.mmap(fd, 0, prot=mmap.PROT_READ) as mm:
+            data = bytes(mm)
+    finally:
+        os.close(fd)
+
+    return _loads(data) if not data.isspace() else {}
+
+
+def read_payload() -> Dict:
+    """Parse the hook payload from stdin (exit 1 on malformed JSON)."""
+    data = sys.stdin.buffer.read()
+    try:
+        return _loads(data)
+    except json.JSONDecodeError:
+        # orjson rejects lone surrogate escapes ("\ud800") that json accepts
+        pass
+    try:
+        return json.loads(data)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        print("ERROR: Invalid JSON input", file=sys.stderr)
+        sys.exit(1)
+
+
+def build_rule_sets(policy: Dict) -> Dict[str, Dict[str, List[str]]]:
+    """Group every regex rule by rule set and category."""
+    prohibited = policy.get("prohibited_patterns", {})
+    if not isinstance(prohibited, dict):
+        prohibited = {}
+
+    return {
+        "escape": ESCAPE_PATTERNS,
+        "policy": prohibited,
+        "command": {cat: prohibited.get(cat, []) for cat in COMMAND_CATEGORIES},
+    }
+
+
+def compile_rules(rule_sets: Dict[str, Dict[str, List[str]]], active: Iterable[str]) -> Dict:
+    """
+    Compile the active rule sets into one tagged matcher.
+
+    Returns a dict with:
+    - tags:      group name -> (rule_set, category, pattern) triples owning it
+                 (a pattern shared by several rule sets is compiled once)
+    - folded:    lowercased, case-sensitive alternation of every pattern,
+                 for lowercased ASCII text
+    - source:    the original alternation, for the IGNORECASE fallback
+    - automaton: Aho-Corasick automaton over the literal patterns, or None
+                 when pyahocorasick is not installed
+    - residual:  folded alternation of the non-literal patterns (used with
+                 the automaton)
+    - prefilter: RE2 set of every folded pattern, or None when google-re2 is
+                 not installed or a pattern is not RE2-compatible
+    - required:  lowercased literals of which every match contains at least
+                 one, or None if some pattern has no required literal
+    - separate:  (IGNORECASE regex, group name) pairs for the patterns
+                 scanned outside the alternation: anchored patterns of
+                 SINGLE_LINE_RULE_SETS (without MULTILINE), and patterns that
+                 do not fuse cleanly (see fuses_cleanly)
+    """
+    key = tuple(sorted(active))
+    cached = _COMBINED.get((id(rule_sets), key))
+    if cached:
+        return cached
+
+    group_of: Dict[str, str] = {}
+    separate_of: Dict[Tuple[str, int], str] = {}
+    tags: Dict[str, List[Tuple[str, str, str]]] = {}
+    for rule_set in key:
+        single_line = rule_set in SINGLE_LINE_RULE_SETS
+        for category, patterns in rule_sets.get(rule_set, {}).items():
+            for pattern in patterns:
+                if single_line and _has_unescaped(pattern, "^$") or not fuses_cleanly(pattern):
+                    flags = re.IGNORECASE if single_line else re.IGNORECASE | re.MULTILINE
+                    name = separate_of.get((pattern, flags))
+                    if name is None:
+                        name = separate_of[(pattern, flags)] = f"s{len(separate_of)}"
+                        tags[name] = []
+                    tags[name].append((rule_set, category, pattern))
+                    continue
+                name = group_of.get(pattern)
+                if name is None:
+                    name = group_of[pattern] = f"r{len(group_of)}"
+                    tags[name] = []
+                tags[name].append((rule_set, category, pattern))
+
+    alternation = _alternation(group_of.items())
+    compiled = {
+        "tags": tags,
+        "folded": re.compile(fold_pattern(alternation), re.MULTILINE),
+        "source": alternation,
+        "automaton": None,
+        "residual": None,
+        "prefilter": _re2_set(group_of) if re2 is not None else None,
+        "required": _required_literals(group_of),
+        "separate": [(re.compile(pattern, flags), name) for (pattern, flags), name in separate_of.items()],
+        "rule_sets": rule_sets,  # keeps the id() in the cache key unique
+    }
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        residual = []
+        for pattern, name in group_of.items():
+            literal = literal_of(pattern)
+            if literal:
+                automaton.add_word(literal.lower(), (name, len(literal)))
+            else:
+                residual.append((pattern, name))
+        if len(automaton):
+            automaton.make_automaton()
+            compiled["automaton"] = automaton
+            compiled["residual"] = re.compile(fold_pattern(_alternation(residual)), re.MULTILINE)
+
+    _COMBINED[(id(rule_sets), key)] = compiled
+    return compiled
+
+
+def _re2_set(patterns: Iterable[str]):
+    """Compile folded patterns into one RE2 set (None if any is unsupported)."""
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    try:
+        rule_set = re2.Set.SearchSet()
+        for pattern in patterns:
+            rule_set.Add("(?m)" + fold_pattern(pattern))
+        rule_set.Compile()
+    except Exception:
+        # Lookarounds, backreferences, ... stay on the re path
+        return None
+    return rule_set
+
+
+def _required_literals(patterns: Iterable[str]) -> Optional[Tuple[str, ...]]:
+    """Minimal set of literals one of which appears in any match of any pattern."""
+    literals = set()
+    for pattern in patterns:
+        literal = required_literal(pattern)
+        if literal is None:
+            return None
+        literals.add(literal)
+    # A literal containing a shorter one is implied by it
+    return tuple(
+        lit for lit in sorted(literals, key=len)
+        if not any(other in lit for other in literals if other != lit)
+    )
+
+
+def _has_unescaped(pattern: str, chars: str) -> bool:
+    """Whether the pattern has one of chars unescaped anywhere (inside groups too)."""
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            # Skip the escaped character, so \\| is a backslash then a real |
+            i += 2
+        elif pattern[i] in chars:
+            return True
+        else:
+            i += 1
+    return False
+
+
+def required_literal(pattern: str) -> Optional[str]:
+    """
+    Longest lowercased literal every match of the pattern must contain.
+
+    Only literal runs before the first group or character class count, and a
+    character made optional by ?, * or {m,n} ends its run. None when the
+    pattern has alternation at any depth, a character code escape (\x65
+    would otherwise leave "65" in the literal), or no literal at all.
+    """
+    if _has_unescaped(pattern, "|"):
+        return None
+    runs = [[]]
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            escaped = pattern[i + 1:i + 2]
+            if escaped and escaped in _CHAR_CODE_ESCAPES:
+                return None
+            # \b, \s, \w, \d ... match no fixed text
+            atom = escaped if escaped and not escaped.isalnum() else None
+            i += 2
+        elif ch in "([":
+            break
+        elif ch == "{":
+            i = pattern.find("}", i) + 1 or len(pattern)
+            runs.append([])
+            continue
+        elif ch in _REGEX_META:
+            atom = None
+            i += 1
+        else:
+            atom = ch
+            i += 1
+        if atom is not None and pattern[i:i + 1] in ("?", "*", "{"):
+            atom = None
+        if atom is None:
+            runs.append([])
+        else:
+            runs[-1].append(atom)
+    return max(("".join(run) for run in runs), key=len).lower() or None
+
+
+def fuses_cleanly(pattern: str) -> bool:
+    """
+    Whether the pattern keeps its meaning as one branch of the alternation.
+
+    Global inline flags ((?i), ...) are only valid at the start of a regex,
+    numbered backreferences would count the other branches' groups, named
+    groups or conditionals can clash with another rule's names, and
+    fold_pattern cannot lowercase a character given by its code (\x45).
+    """
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            escaped = pattern[i + 1:i + 2]
+            if escaped and escaped in _CHAR_CODE_ESCAPES:
+                return False
+            i += 2
+        elif pattern.startswith("(?", i):
+            if _GLOBAL_FLAGS_RE.match(pattern, i) or pattern.startswith(("(?P", "(?("), i):
+                return False
+            i += 2
+        else:
+            i += 1
+    return True
+
+
+def _alternation(named_patterns: Iterable[Tuple[str, str]]) -> str:
+    alternation = "|".join(f"(?P<{name}>{pattern})" for pattern, name in named_patterns)
+    # (?!) never matches: an empty selection scans clean
+    return alternation or r"(?!)"
+
+
+def fold_pattern(pattern: str) -> str:
+    """Lowercase a pattern's literals, leaving escapes (\\S, \\W, \\B, ...) and (?P intact."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            out.append(pattern[i:i + 2])
+            i += 2
+        elif pattern.startswith("(?P", i):
+            out.append("(?P")
+            i += 3
+        else:
+            out.append(pattern[i].lower())
+            i += 1
+    return "".join(out)
+
+
+def literal_of(pattern: str) -> Optional[str]:
+    """The literal text a pattern matches, or None if it uses any regex syntax."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            escaped = pattern[i + 1:i + 2]
+            # \b, \s, \w, \d ... are classes/assertions, not literals
+            if not escaped or escaped.isalnum():
+                return None
+            out.append(escaped)
+            i += 2
+        elif ch in _REGEX_META:
+            return None
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out) or None
+
+
+def _find_spans(code: str, compiled: Dict) -> Iterable[Tuple[int, int, str]]:
+    """Yield (start, end, group name) for every rule match, in text order."""
+    spans = _find_fused_spans(code, compiled)
+    if not compiled["separate"]:
+        return spans
+    spans = list(spans)
+    for regex, name in compiled["separate"]:
+        spans.extend((m.start(), m.end(), name) for m in regex.finditer(code))
+    spans.sort(key=lambda span: span[0])
+    return spans
+
+
+def _find_fused_spans(code: str, compiled: Dict) -> Iterable[Tuple[int, int, str]]:
+    """Yield (start, end, group name) for every match of the fused alternation, in text order."""
+    if not code.isascii():
+        # Unicode lowercasing can change lengths, so match the original text
+        regex = re.compile(compiled["source"], re.IGNORECASE | re.MULTILINE)
+        return ((m.start(), m.end(), m.lastgroup) for m in regex.finditer(code))
+
+    # One C-level lower() instead of case-folding every comparison;
+    # ASCII lowercasing keeps offsets, so matches index into code as-is
+    text = code.lower()
+
+    # Every match contains one of the required literals; substring search
+    # for each is far cheaper than running the alternation over clean code
+    required = compiled["required"]
+    if required is not None and not any(literal in text for literal in required):
+        return ()
+
+    # Most edits are clean: one linear RE2 pass over every rule proves it
+    prefilter = compiled["prefilter"]
+    if prefilter is not None and not _RE2_WS_GAP.search(text) and not prefilter.Match(text):
+        return ()
+
+    automaton = compiled["automaton"]
+    if automaton is None:
+        return ((m.start(), m.end(), m.lastgroup) for m in compiled["folded"].finditer(text))
+
+    # Literals: one Aho-Corasick pass. A literal's own overlapping
+    # occurrences are skipped, as a per-pattern finditer would.
+    spans = []
+    literal_end: Dict[str, int] = {}
+    for last, (name, length) in automaton.iter(text):
+        start = last - length + 1
+        if start >= literal_end.get(name, 0):
+            literal_end[name] = last + 1
+            spans.append((start, last + 1, name))
+    spans.extend((m.start(), m.end(), m.lastgroup) for m in compiled["residual"].finditer(text))
+    spans.sort(key=lambda span: span[0])
+    return spans
+
+
+def scan(code: str, rule_sets: Dict[str, Dict[str, List[str]]], active: Iterable[str],
+         path: str = "unknown", first_only: bool = False) -> List[Dict]:
+    """
+    Scan code once against every active rule set.
+
+    Each hit is reported once per owning rule set. Where matches of two
+    regex rules overlap, only the leftmost (first compiled on a tie) is
+    reported; the edit is blocked either way. With first_only, stop at the
+    first match.
+    """
+    compiled = compile_rules(rule_sets, active)
+    tags = compiled["tags"]
+    hits = []
+
+    for start, end, name in _find_spans(code, compiled):
+        line_num = code.count("\n", 0, start) + 1
+        for rule_set, category, pattern in tags[name]:
+            hits.append(
+                {
+                    "rule_set": rule_set,
+                    "category": category,
+                    "pattern": pattern,
+                    "line": line_num,
+                    "snippet": code[start:end],
+                    "file": path,
+                }
+            )
+        if first_only:
+            break
+
+    return hits
+
+
+def scan_edits(jobs: List[Tuple[str, Iterable[str], str]], rule_sets: Dict[str, Dict[str, List[str]]],
+               first_only: bool = False) -> List[List[Dict]]:
+    """
+    Scan several edits, given as (code, active rule sets, path) jobs.
+
+    Returns one hit list per job. With google-re2 installed, a bulk edit is
+    scanned on a thread pool: RE2 releases the GIL for its native pass, so
+    the prefilter runs on several cores. The stdlib re engine holds the GIL,
+    so without RE2 (or with first_only, which stops at the first edit with a
+    hit and returns only the lists up to it) edits are scanned in order.
+    """
+    workers = min(8, len(jobs), os.cpu_count() or 1)
+    if re2 is None or first_only or workers < 2:
+        results = []
+        for code, active, path in jobs:
+            results.append(scan(code, rule_sets, active, path, first_only))
+            if first_only and results[-1]:
+                break
+        return results
+
+    # Compile each selection up front so threads only read the cache
+    for active in {tuple(sorted(active)) for _, active, _ in jobs}:
+        compile_rules(rule_sets, active)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda job: scan(job[0], rule_sets, job[1], job[2]), jobs))
+
+
+def detect_escape_patterns(code: str, path: str = "unknown", first_only: bool = False) -> List[Dict]:
+    """Scan code for escape attempt patterns (first_only: stop at the first one)."""
+    return scan(code, ESCAPE_RULE_SETS, ("escape",), path, first_only)
+
+
+def report_all_violations(policy: Dict) -> bool:
+    """Audit mode: list every violation instead of blocking on the first."""
+    return bool((policy.get("escape_detection", {}) or {}).get("report_all_violations", False))
+
+
+def format_escape(hit: Dict) -> str:
+    return f"{hit['file']}:{hit['line']} ({hit['category']}) → {hit['snippet']}"
+
+
+def format_policy(hit: Dict) -> str:
+    return POLICY_MESSAGE.format(**hit)
+
+
+def format_command(hit: Dict) -> str:
+    return COMMAND_CATEGORIES[hit["category"]].format(**hit)
+
+
+def is_test_path(path: str, kinds: Iterable[str] = tuple(TEST_DIRECTORIES)) -> bool:
+    """Whether path is test code of one of the given kinds (test, spec, mock).
+
+    Each hook passes the kinds it has always exempted. Only whole directory
+    components and the file-name forms in TEST_NAME_FORMS count, so a name
+    that merely contains "test" (latest.py, inspect.py) is production code.
+    """
+    *directories, name = path.replace("\\", "/").split("/")
+    directories = {directory.lower() for directory in directories}
+    return any(
+        not TEST_DIRECTORIES[kind].isdisjoint(directories) or TEST_NAME_FORMS[kind].search(name)
+        for kind in kinds
+    )
+
+
+def skip_for_policy(path: str) -> bool:
+    """Test, spec and config files are exempt from the code policy."""
+    return is_test_path(path, ("test", "spec")) or path.endswith((".json", ".md", ".yaml", ".yml"))
+
+
+def skip_for_command(path: str) -> bool:
+    """Test, spec, mock and config files are exempt from command blocking."""
+    return is_test_path(path, ("test", "spec", "mock")) or path.endswith((".json", ".md", ".yaml", ".yml", ".toml"))
+
+
+def is_comment(line: str) -> bool:
+    s = line.strip()
+    return not s or s.startswith(COMMENT_PREFIXES)
+
+def is_executable(line: str) -> bool:
+    s = line.strip()
+    if not s or is_comment(s):
+        return False
+    if re.fullmatch(r"[{}();,\[\]]+", s):
+        return False
+    return True
+
+def count_exec(code: str) -> int:
+    return sum(1 for l in code.splitlines() if is_executable(l))
+
+def detect_language(path: str) -> str:
+    """Detect language from file extension."""
+    ext = Path(path).suffix.lower()
+    ext_map = {
+        ".py": "python",
+        ".js": "javascript",
+        ".ts": "typescript",
+        ".jsx": "javascript",
+        ".tsx": "typescript",
+        ".java": "java",
+        ".c": "c",
+        ".cpp": "cpp",
+        ".cc": "cpp",
+        ".cxx": "cpp",
+        ".h": "c",
+        ".hpp": "cpp",
+        ".cs": "csharp",
+        ".go": "go",
+        ".rs": "rust",
+        ".php": "php",
+        ".rb": "ruby",
+        ".swift": "swift",
+        ".kt": "kotlin",
+        ".r": "r",
+        ".m": "matlab",
+    }
+    return ext_map.get(ext, "unknown")
+
+
+def check_code_policy(old: str, new: str, path: str, hard_failed: bool = False) -> List[str]:
+    """
+    Non-regex-table code policy checks (completeness, logic preservation, realism).
+
+    hard_failed: the edit already has a HARD FAIL from the pattern scan. The
+    logic-removal line counts are then skipped, since the edit is blocked anyway
+    and counting executable lines is the most expensive check here.
+    """
+    violations = []
+    lang = detect_language(path)
+
+    # ============================================================
+    # IMPLEMENTATION COMPLETENESS CHECKS
+    # ============================================================
+
+    # No empty/stub implementations (one table lookup per edit)
+    for regex, message in LANG_RULES.get(lang, ()):
+        if regex.search(new):
+            violations.append(message.format(path=path))
+
+    # ============================================================
+    # LOGIC PRESERVATION AND COMPLETENESS
+    # ============================================================
+
+    # No logic removal (counted only when nothing else has blocked the edit)
+    if not hard_failed and old.strip() and new.strip():
+        old_exec = count_exec(old)
+        new_exec = count_exec(new) if old_exec > 0 else 0
+        if old_exec > 0 and new_exec < old_exec:
+            violations.append(
+                f"HARD FAIL: Logic removal in {path} ({old_exec} → {new_exec} lines)"
+            )
+
+    # No wholesale code deletion
+    if old.strip() and not new.strip():
+        violations.append(f"HARD FAIL: Code completely removed in {path}")
+
+    # Check for unhandled branches/undefined behavior
+    if lang == "python":
+        # Missing exception handling. A body runs to the next top-level def
+        # (or EOF); bodies are searched in place via pos/endpos, never sliced.
+        top_level_defs = [m.start() for m in _TOP_LEVEL_DEF_RE.finditer(new)]
+        for func in _FUNC_DEF_RE.finditer(new):
+            body_start = func.end()
+            # Find next function or EOF
+            k = bisect.bisect_left(top_level_defs, body_start)
+            body_end = top_level_defs[k] if k < len(top_level_defs) else len(new)
+
+            # Check if function that calls external code has try/except
+            if _IO_CALL_RE.search(new, body_start, body_end) and \
+               not _TRY_RE.search(new, body_start, body_end):
+                violations.append(
+                    f"Missing error handling in {path} function {func.group(1)}"
+                )
+
+    # ============================================================
+    # REAL WORKING IMPLEMENTATION CHECKS
+    # ============================================================
+
+    # Check for placeholder code
+    if re.search(r"(pass|None|0|\[\]|\{\}|\"\")\s*#.*real", new, re.IGNORECASE):
+        violations.append(f"Placeholder code in {path}")
+
+    # Check for hardcoded test/demo values
+    if re.search(r"(demo_data|test_data|fake_|sample_|mock_)", new, re.IGNORECASE):
+        violations.append(f"Hardcoded test/demo data in {path} (not production code)")
+
+    # Check for conditional disabling
+    if re.search(r"if\s+(False|0|None|\"\")\s*:|if\s+(__debug__|DEBUG|TEST)\s*:", new):
+        violations.append(f"Conditionally disabled code in {path}")
+
+    # Check for magic numbers without validation
+    if re.search(r"(timeout|max|limit|threshold)\s*=\s*[0-9]+\s*#.*", new):
+        # Warn if no comments explaining the choice
+        if not re.search(r"(timeout|max|limit|threshold)\s*=\s*[0-9]+\s*#.*(?:based|empirical|tested|requirement)", new):
+            violations.append(f"Magic number without justification in {path}")
+
+    return violations